@@ -7,9 +7,17 @@ in the 1024x1792 splash art. The cropped image is placed on a plain
 dark background to help Image-to-3D isolate the subject.
 
 Output: public/assets/art/wpn_{class}_{type}_ref.png
+
+Runs on stock Pillow. Pillow-SIMD is a drop-in replacement with faster
+resize/blur paths (AVX2 build):
+  pip uninstall pillow
+  CC="cc -mavx2" pip install --no-binary :all: pillow-simd
 """
 
 from PIL import Image, ImageFilter, ImageDraw
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+import io
 import os
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -38,50 +46,72 @@ CROP_REGIONS = {
 # Target output size for Meshy (square, reasonable resolution)
 OUTPUT_SIZE = 1024
 
-def crop_weapon_ref(class_id, weapon_type, box):
-    splash_path = os.path.join(ART_DIR, f'{class_id}_splash.png')
-    if not os.path.exists(splash_path):
-        print(f'  SKIP: {splash_path} not found')
-        return False
-
-    img = Image.open(splash_path)
-
+def crop_weapon_ref(splash, class_id, weapon_type, box):
     # Crop the weapon region
-    cropped = img.crop(box)
+    cropped = splash.crop(box)
     w, h = cropped.size
 
-    # Place on a dark neutral background (square)
-    dim = max(w, h)
-    # Add some padding
-    canvas_size = int(dim * 1.15)
-    canvas = Image.new('RGB', (canvas_size, canvas_size), (30, 30, 35))
-
-    # Center the crop on the canvas
-    paste_x = (canvas_size - w) // 2
-    paste_y = (canvas_size - h) // 2
-    canvas.paste(cropped, (paste_x, paste_y))
+    # Scale so the crop fits a square with some padding, resizing the crop
+    # itself rather than a padded canvas
+    canvas_size = int(max(w, h) * 1.15)
+    scale = OUTPUT_SIZE / canvas_size
+    tw, th = round(w * scale), round(h * scale)
+    resized = cropped.resize((tw, th), Image.LANCZOS)
 
-    # Resize to output size
-    canvas = canvas.resize((OUTPUT_SIZE, OUTPUT_SIZE), Image.LANCZOS)
+    # Center on a dark neutral background (square)
+    canvas = Image.new('RGB', (OUTPUT_SIZE, OUTPUT_SIZE), (30, 30, 35))
+    paste_x = (OUTPUT_SIZE - tw) // 2
+    paste_y = (OUTPUT_SIZE - th) // 2
+    canvas.paste(resized, (paste_x, paste_y))
 
     out_path = os.path.join(ART_DIR, f'wpn_{class_id}_{weapon_type}_ref.png')
-    canvas.save(out_path, 'PNG')
+    # Fast, light compression: the consumer (Meshy) is lossy anyway
+    canvas.save(out_path, 'PNG', compress_level=1)
     print(f'  OK: {os.path.basename(out_path)} ({w}x{h} crop → {OUTPUT_SIZE}x{OUTPUT_SIZE})')
     return True
 
 
+def crop_class_refs(class_id, weapons):
+    """Crop every weapon of a class, decoding its splash art only once."""
+    splash_path = os.path.join(ART_DIR, f'{class_id}_splash.png')
+    if not os.path.exists(splash_path):
+        print(f'  SKIP: {splash_path} not found')
+        return 0
+
+    with Image.open(splash_path) as splash:
+        splash.load()
+    if splash.mode != 'RGB':
+        splash = splash.convert('RGB')
+
+    success = 0
+    for weapon_type, box in weapons.items():
+        if crop_weapon_ref(splash, class_id, weapon_type, box):
+            success += 1
+    return success
+
+
+def crop_class_refs_task(task):
+    """Worker entry point: run crop_class_refs, capturing its log output."""
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        success = crop_class_refs(*task)
+    return success, buf.getvalue()
+
+
 def main():
     print('Cropping weapon references from splash art...\n')
 
     total = 0
     success = 0
 
-    for class_id, weapons in CROP_REGIONS.items():
-        print(f'{class_id.upper()}:')
-        for weapon_type, box in weapons.items():
-            total += 1
-            if crop_weapon_ref(class_id, weapon_type, box):
-                success += 1
+    # Classes are independent; process them in parallel, report in order
+    tasks = list(CROP_REGIONS.items())
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for (class_id, weapons), (count, log) in zip(tasks, ex.map(crop_class_refs_task, tasks)):
+            print(f'{class_id.upper()}:')
+            print(log, end='')
+            total += len(weapons)
+            success += count
 
     print(f'\nDone: {success}/{total} weapon references created')
     print(f'Output dir: {ART_DIR}')
@@ -6,11 +6,20 @@ images for Meshy Image-to-3D so character models generate without
 baked-in weapon geometry.
 
 Output: public/assets/art/{class}_model_ref_noweapons.png
+
+Runs on stock Pillow. Pillow-SIMD is a drop-in replacement with faster
+resize/blur paths (AVX2 build):
+  pip uninstall pillow
+  CC="cc -mavx2" pip install --no-binary :all: pillow-simd
 """
 
-from PIL import Image, ImageFilter, ImageDraw
+from PIL import Image, ImageFilter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 import numpy as np
+import io
 import os
+import shutil
 
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ART_DIR = os.path.join(ROOT, 'public', 'assets', 'art')
@@ -52,38 +61,70 @@ WEAPON_REGIONS = {
     ],
 }
 
+# Radius of the Gaussian blur used as the fill source
+FILL_BLUR_RADIUS = 60
+
 
 def sample_background_color(img, region, margin=30):
     """Sample average color from around a region (outside the region bounds)."""
     x1, y1, x2, y2 = region
     w, h = img.size
-    pixels = []
-
-    # Sample from strips around the region
-    for dx in range(-margin, (x2 - x1) + margin, 5):
-        for side_y in [y1 - margin, y2 + margin]:
-            sx = max(0, min(w - 1, x1 + dx))
-            sy = max(0, min(h - 1, side_y))
-            pixels.append(img.getpixel((sx, sy)))
-
-    for dy in range(-margin, (y2 - y1) + margin, 5):
-        for side_x in [x1 - margin, x2 + margin]:
-            sx = max(0, min(w - 1, side_x))
-            sy = max(0, min(h - 1, y1 + dy))
-            pixels.append(img.getpixel((sx, sy)))
-
-    if not pixels:
+    x1, y1, x2, y2 = max(0, x1), max(0, y1), min(w, x2), min(h, y2)
+    if x1 >= x2 or y1 >= y2:
+        # Region lies entirely outside the image
         return (40, 40, 45)
 
-    # Average color
-    r = sum(p[0] for p in pixels) // len(pixels)
-    g = sum(p[1] for p in pixels) // len(pixels)
-    b = sum(p[2] for p in pixels) // len(pixels)
-    return (r, g, b)
+    # Only convert the region plus its margin, not the whole image
+    ox, oy = max(0, x1 - margin), max(0, y1 - margin)
+    arr = np.asarray(img.crop((ox, oy, min(w, x2 + margin), min(h, y2 + margin))))
+    x1, y1, x2, y2 = x1 - ox, y1 - oy, x2 - ox, y2 - oy
+
+    # Strips of width `margin` bordering each side of the region
+    strips = [
+        arr[:y1],         # top
+        arr[y2:],         # bottom
+        arr[y1:y2, :x1],  # left
+        arr[y1:y2, x2:],  # right
+    ]
+    count = sum(s.shape[0] * s.shape[1] for s in strips)
+
+    if not count:
+        return (40, 40, 45)
+
+    # Average color (per-strip channel sums, no concatenated copy)
+    total = sum(s.reshape(-1, 3).sum(axis=0, dtype=np.uint64) for s in strips)
+    return tuple((total // count).astype(np.uint8).tolist())
+
+
+def blur_fill_source(img, radius=60):
+    """Approximate a large Gaussian blur by blurring a downscaled copy.
+
+    The fill only needs to be a smooth smear, so blur at a scale where the
+    radius is ~8px; that's ~64x fewer pixels through the kernel. Returns the
+    low-res result; callers upsample just the tiles they need.
+    """
+    w, h = img.size
+    scale = max(1, round(radius / 8))
+    small = img.resize((max(1, w // scale), max(1, h // scale)), Image.BILINEAR)
+    # Pillow's GaussianBlur is already three running-sum box passes (O(1) per
+    # pixel in the radius), so chaining BoxBlur by hand would only be slower
+    return small.filter(ImageFilter.GaussianBlur(radius=radius / scale))
+
+
+def feather_ramp(n, lo, hi, feather):
+    """1D blend weights over n pixels for the span [lo, hi), feathered at both edges."""
+    idx = np.arange(n)
+    dist = np.minimum(idx - lo, hi - 1 - idx)  # negative outside the span
+    return np.clip((dist + feather) / (2 * feather), 0, 1)
 
 
-def paint_over_region(img, region, feather=40):
-    """Paint over a region with blurred surrounding content for seamless blending."""
+def paint_over_region(img, src, small_blur, region, feather=40):
+    """Paint over a region with blurred surrounding content for seamless blending.
+
+    The fill is upsampled from `small_blur` (see blur_fill_source) for a padded
+    tile around the region only, and blended into `img` in place. `src` is the
+    untouched original, sampled for the flat fallback fill.
+    """
     x1, y1, x2, y2 = region
     w, h = img.size
 
@@ -93,29 +134,39 @@ def paint_over_region(img, region, feather=40):
     x2 = min(w, x2)
     y2 = min(h, y2)
 
-    # Create a copy for the blurred fill source
-    # Use a large Gaussian blur of the original image
-    blurred = img.filter(ImageFilter.GaussianBlur(radius=60))
-
-    # Create a mask for smooth blending
-    mask = Image.new('L', (w, h), 0)
-    draw = ImageDraw.Draw(mask)
-
-    # Draw the core region fully opaque
-    inner_x1 = x1 + feather
-    inner_y1 = y1 + feather
-    inner_x2 = x2 - feather
-    inner_y2 = y2 - feather
-
-    if inner_x2 > inner_x1 and inner_y2 > inner_y1:
-        draw.rectangle([inner_x1, inner_y1, inner_x2, inner_y2], fill=255)
-
-    # Draw the full region and blur the mask for feathering
-    draw.rectangle([x1, y1, x2, y2], fill=200)
-    mask = mask.filter(ImageFilter.GaussianBlur(radius=feather))
-
-    # Composite: blend blurred version over original using the mask
-    img = Image.composite(blurred, img, mask)
+    # Padded ROI: room for the mask feather
+    roi_box = (max(0, x1 - feather), max(0, y1 - feather),
+               min(w, x2 + feather), min(h, y2 + feather))
+    rx, ry = roi_box[0], roi_box[1]
+    roi_size = (roi_box[2] - rx, roi_box[3] - ry)
+
+    # Feather mask: separable linear ramps, 0 at `feather` outside the region
+    # edge up to fully opaque at `feather` inside it. Sides on the image border
+    # aren't feathered (nothing beyond them to blend with), so push them out
+    xr = feather_ramp(roi_size[0],
+                      -feather if x1 == 0 else x1 - rx,
+                      roi_size[0] + feather if x2 == w else x2 - rx, feather)
+    yr = feather_ramp(roi_size[1],
+                      -feather if y1 == 0 else y1 - ry,
+                      roi_size[1] + feather if y2 == h else y2 - ry, feather)
+    # (scaled to 0..256 so the blend below can shift instead of divide)
+    mask = np.rint(np.outer(yr, xr) * 256).astype(np.uint16)[..., None]
+
+    if x2 - x1 > 2 * feather and y2 - y1 > 2 * feather:
+        # Same ROI in low-res coordinates, upsampled to full size
+        sx, sy = small_blur.size[0] / w, small_blur.size[1] / h
+        small_box = (roi_box[0] * sx, roi_box[1] * sy, roi_box[2] * sx, roi_box[3] * sy)
+        blurred = small_blur.resize(roi_size, Image.BILINEAR, box=small_box)
+    else:
+        # Region too small for a fully opaque core; the feathered mask never
+        # fully covers it, so fill from the flat surrounding color instead
+        blurred = Image.new('RGB', roi_size, sample_background_color(src, region))
+
+    # Blend blurred version over original using the mask, ROI only
+    orig = np.asarray(img.crop(roi_box), dtype=np.uint16)
+    fill = np.asarray(blurred, dtype=np.uint16)
+    out = ((fill * mask + orig * (256 - mask)) >> 8).astype(np.uint8)
+    img.paste(Image.fromarray(out), roi_box)
     return img
 
 
@@ -128,38 +179,60 @@ def remove_weapons(class_id):
 
     regions = WEAPON_REGIONS.get(class_id, [])
     if not regions:
-        # Just copy the original
-        img = Image.open(src_path)
+        # Just copy the original (byte-level, no decode/re-encode)
         out_path = os.path.join(ART_DIR, f'{class_id}_model_ref_noweapons.png')
-        img.save(out_path, 'PNG')
+        shutil.copyfile(src_path, out_path)
         print(f'  OK: {os.path.basename(out_path)} (no weapon regions defined, copied original)')
         return True
 
-    img = Image.open(src_path).convert('RGB')
+    # Decode up front and release the file handle before the CPU-heavy work
+    with Image.open(src_path) as img:
+        img.load()
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
     print(f'  Source: {os.path.basename(src_path)} ({img.size[0]}x{img.size[1]})')
     print(f'  Removing {len(regions)} weapon region(s)...')
 
+    # Blur the original once at low resolution and keep it untouched; every
+    # region fills from these, so later regions don't pick up earlier
+    # painted-over content
+    small_blur = blur_fill_source(img, radius=FILL_BLUR_RADIUS)
+    src = img.copy()
+
     for i, region in enumerate(regions):
-        img = paint_over_region(img, region, feather=35)
+        img = paint_over_region(img, src, small_blur, region, feather=35)
         print(f'    Region {i + 1}: ({region[0]},{region[1]}) → ({region[2]},{region[3]})')
 
     out_path = os.path.join(ART_DIR, f'{class_id}_model_ref_noweapons.png')
-    img.save(out_path, 'PNG')
+    # Intermediate input for Meshy; favour encode speed over file size
+    img.save(out_path, 'PNG', compress_level=1)
     print(f'  OK: {os.path.basename(out_path)}')
     return True
 
 
+def remove_weapons_task(class_id):
+    """Worker entry point: run remove_weapons, capturing its log output."""
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        ok = remove_weapons(class_id)
+    return ok, buf.getvalue()
+
+
 def main():
     print('Removing weapons from model_ref images...\n')
 
     total = 0
     success = 0
 
-    for class_id in WEAPON_REGIONS:
-        print(f'{class_id.upper()}:')
-        total += 1
-        if remove_weapons(class_id):
-            success += 1
+    # Classes are independent; process them in parallel, report in order
+    class_ids = list(WEAPON_REGIONS)
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+        for class_id, (ok, log) in zip(class_ids, ex.map(remove_weapons_task, class_ids)):
+            print(f'{class_id.upper()}:')
+            print(log, end='')
+            total += 1
+            if ok:
+                success += 1
 
     print(f'\nDone: {success}/{total} weaponless refs created')
     print(f'Output dir: {ART_DIR}')